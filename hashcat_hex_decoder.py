@@ -3,23 +3,38 @@
 Hex Decoder - Converts $HEX[...] encoded strings within Hashcat potfiles to UTF-8 text
 """
 
-import argparse
+import binascii
+import io
+import mmap
 import sys
-import re
 import os
 
 # ANSI color codes
 LIGHT_RED = '\033[91m'
 RESET = '\033[0m'
 
+# Deletion table for str.translate - strips whitespace in one C pass with
+# no regex state-machine overhead
+_WS_DELETE = str.maketrans('', '', ' \t\n\r\v\f')
+
+# Files up to this size are read in one call and split in C; larger files
+# fall back to streaming line iteration to keep memory bounded
+_BULK_READ_LIMIT = 512 * 1024 * 1024  # 512 MiB
+
+# Batch size for the streaming path: big enough to amortize the batched
+# decode and write, small enough to stay cache- and memory-friendly
+_BATCH_LINES = 4096
+
 # ==============================
 # Function to convert HEX to UTF8 string
 # ==============================
 def convert_hex_to_utf8(hex_string):
     """Converts a hexadecimal string to UTF-8 decoded text."""
     # Remove any whitespace from the hex string
-    hex_string = re.sub(r'\s', '', hex_string)
+    return _decode_clean(hex_string.translate(_WS_DELETE))
 
+def _decode_clean(hex_string):
+    """Like convert_hex_to_utf8, but for input already known to be stripped."""
     try:
         # Convert hex string to bytes
         bytes_data = bytes.fromhex(hex_string)
@@ -27,56 +42,45 @@ def convert_hex_to_utf8(hex_string):
         # Invalid hex format
         return None, f"Invalid hex format: {e}"
 
+    # The ASCII decoder is effectively a memcpy in CPython, so take it for
+    # the common all-ASCII case and keep the full UTF-8 validator for the rest
+    if bytes_data.isascii():
+        return bytes_data.decode('ascii')
+
     try:
         # Try to decode as UTF-8
         return bytes_data.decode('utf-8')
-    except UnicodeDecodeError as e:
-        # Invalid UTF-8 sequence - try latin-1 as fallback
-        try:
-            decoded = bytes_data.decode('latin-1')
-            return decoded, "Warning: Decoded using latin-1 (not valid UTF-8)"
-        except Exception:
-            return None, f"UTF-8 decode error: {e}"
+    except UnicodeDecodeError:
+        # Invalid UTF-8 sequence - fall back to latin-1, which maps every
+        # byte to a code point and therefore cannot fail
+        return bytes_data.decode('latin-1'), "Warning: Decoded using latin-1 (not valid UTF-8)"
 
 # ==============================
 # Process hex string directly
 # ==============================
 def process_hex_string(hex_input, output_file=None):
     """Decodes a hex string directly and outputs to file or stdout."""
-    # Check if input matches $HEX[hexadecimal] pattern
-    match = re.match(r'^\$HEX\[([0-9A-Fa-f]+)\]$', hex_input)
-
-    warning_msg = None
-    if match:
-        hex_value = match.group(1)
-        result = convert_hex_to_utf8(hex_value)
-
-        if isinstance(result, tuple):
-            decoded, msg = result
-            if decoded is None:
-                print(f"{LIGHT_RED}Error: {msg}{RESET}", file=sys.stderr)
-                if "non-hexadecimal number found in fromhex() arg at position 0" in msg:
-                    print(f"\n{LIGHT_RED}Tip: Did you use single quotes? On Windows, use single quotes '$HEX[...]' to prevent shell interpretation of the $ character.{RESET}", file=sys.stderr)
-                sys.exit(1)
-            else:
-                result = decoded
-                warning_msg = msg
-        else:
-            # Successful UTF-8 decode (no tuple returned)
-            pass
+    # Check for the $HEX[hexadecimal] wrapper; a startswith/endswith pair
+    # is cheaper than spinning up the regex engine for one small string,
+    # and bytes.fromhex validates the payload characters anyway. The
+    # length check rejects a bare $HEX[] just as the original regex did
+    if len(hex_input) > 6 and hex_input.startswith('$HEX[') and hex_input.endswith(']'):
+        result = _decode_clean(hex_input[5:-1])
     else:
         # Assume it's raw hex without $HEX[] wrapper
         result = convert_hex_to_utf8(hex_input)
-        if isinstance(result, tuple):
-            decoded, msg = result
-            if decoded is None:
-                print(f"{LIGHT_RED}Error: {msg}{RESET}", file=sys.stderr)
-                if "non-hexadecimal number found in fromhex() arg at position 0" in msg:
-                    print(f"\n{LIGHT_RED}Tip: Did you use single quotes? On Windows, use single quotes '$HEX[...]' to prevent shell interpretation of the $ character.{RESET}", file=sys.stderr)
-                sys.exit(1)
-            else:
-                result = decoded
-                warning_msg = msg
+
+    warning_msg = None
+    if isinstance(result, tuple):
+        decoded, msg = result
+        if decoded is None:
+            print(f"{LIGHT_RED}Error: {msg}{RESET}", file=sys.stderr)
+            if "non-hexadecimal number found in fromhex() arg at position 0" in msg:
+                print(f"\n{LIGHT_RED}Tip: Did you use single quotes? On Windows, use single quotes '$HEX[...]' to prevent shell interpretation of the $ character.{RESET}", file=sys.stderr)
+            sys.exit(1)
+        else:
+            result = decoded
+            warning_msg = msg
 
     # Output to file or stdout
     if output_file:
@@ -94,49 +98,214 @@ def process_hex_string(hex_input, output_file=None):
             print(f"\n{warning_msg}")
         print(f"Decoded: {result}")
 
+# ==============================
+# Per-line decode helpers
+# ==============================
+def _validate_utf8(bytes_data, line_num):
+    """Returns output bytes for a decoded payload, applying the latin-1 fallback."""
+    # Most payloads are short ASCII passwords; isascii() is a SWAR high-bit
+    # scan in C and ASCII is valid UTF-8, so the validator can be skipped
+    if bytes_data.isascii():
+        return bytes_data
+    try:
+        bytes_data.decode('utf-8')
+    except UnicodeDecodeError:
+        # Invalid UTF-8 sequence - latin-1 maps each byte to the same code
+        # point, re-encoded as UTF-8 for the output file
+        bytes_data = bytes_data.decode('latin-1').encode('utf-8')
+        print(f"Line {line_num}: Warning: Decoded using latin-1 (not valid UTF-8)", file=sys.stderr)
+    return bytes_data
+
+def _decode_hex_line(line, line_num):
+    """Decodes one $HEX[...] line to output bytes, keeping the line on failure."""
+    try:
+        # unhexlify is the C hex decoder and takes bytes directly, so the
+        # payload never has to be lifted to str
+        bytes_data = binascii.unhexlify(line[5:-1])
+    except ValueError as e:
+        # Non-hex payload - keep the line unchanged
+        print(f"Line {line_num}: Failed - Invalid hex format: {e}", file=sys.stderr)
+        return line
+    return _validate_utf8(bytes_data, line_num)
+
+# ==============================
+# Bulk decode for in-memory files
+# ==============================
+def _bulk_fromhex(payloads):
+    """Converts many hex payloads to bytes with a single unhexlify call.
+
+    Returns a list of bytes in payload order, or None when any payload is
+    not clean even-length hex - the caller then falls back to per-line
+    decoding so errors are reported against the right line.
+    """
+    # Odd-length payloads would misalign the slicing of the joined blob,
+    # so punt those batches back to the caller (unhexlify is otherwise
+    # strict: any non-hex byte raises)
+    if any(len(p) % 2 for p in payloads):
+        return None
+    try:
+        blob = binascii.unhexlify(b''.join(payloads))
+    except ValueError:
+        return None
+
+    result = []
+    offset = 0
+    for payload in payloads:
+        length = len(payload) // 2
+        result.append(blob[offset:offset + length])
+        offset += length
+    return result
+
+def _split_lines(raw):
+    """Splits a whole file buffer into lines, each operation one C pass."""
+    if b'\r' in raw:
+        raw = raw.replace(b'\r\n', b'\n')
+    lines = raw.split(b'\n')
+    if lines[-1] == b'':
+        # Trailing newline - the join on output adds it back
+        lines.pop()
+    return lines
+
+def _process_bulk(lines, fout, first_line=1):
+    """Decodes a whole in-memory file, batching all hex payloads into one pass.
+
+    Decoded results are written back into `lines` in place, so callers must
+    pass a list they own.
+    """
+    # Classify with a comprehension: LOAD_FAST-dominated dispatch in the
+    # interpreter beats a for loop calling .append per line
+    # The length check keeps a bare $HEX[] passing through unchanged, as
+    # the original regex (which required at least one hex digit) did
+    hex_indexes = [index for index, line in enumerate(lines)
+                   if len(line) > 6 and line.startswith(b'$HEX[') and line.endswith(b']')]
+
+    if hex_indexes:
+        payloads = [lines[index][5:-1] for index in hex_indexes]
+        decoded = _bulk_fromhex(payloads)
+        if decoded is None:
+            # At least one payload is dirty - decode individually so the
+            # warning points at the offending line
+            for index in hex_indexes:
+                lines[index] = _decode_hex_line(lines[index], first_line + index)
+        else:
+            for index, bytes_data in zip(hex_indexes, decoded):
+                lines[index] = _validate_utf8(bytes_data, first_line + index)
+
+    # The trailing empty element makes join emit the final newline itself;
+    # `join(lines) + b'\n'` would copy the whole assembled buffer a second time
+    lines.append(b'')
+    fout.write(b'\n'.join(lines))
+
+# ==============================
+# Parallel decode for large files
+# ==============================
+def _decode_chunk(task):
+    """Worker: decodes one newline-aligned slice of the input file."""
+    input_file, offset, length, first_line = task
+    with open(input_file, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = mm[offset:offset + length]
+        mm.close()
+
+    buf = io.BytesIO()
+    _process_bulk(_split_lines(data), buf, first_line)
+    return buf.getvalue()
+
+def _process_parallel(input_file, fout):
+    """Decodes a large file by splitting it across cores at newline boundaries."""
+    # Deferred import - only multi-gigabyte inputs ever pay for it
+    import multiprocessing
+
+    workers = os.cpu_count() or 1
+
+    # mmap the input to find the split points and per-chunk line numbers
+    # without reading the file into the parent; workers mmap the same path
+    # and receive only (offset, length) so nothing large is pickled in
+    with open(input_file, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = mm.size()
+
+        bounds = [0]
+        for i in range(1, workers):
+            cut = mm.rfind(b'\n', 0, size * i // workers) + 1
+            if cut > bounds[-1]:
+                bounds.append(cut)
+        bounds.append(size)
+
+        tasks = []
+        first_line = 1
+        for start, end in zip(bounds, bounds[1:]):
+            tasks.append((input_file, start, end - start, first_line))
+            # mmap has no count(), so tally the chunk's newlines through
+            # bounded slices - the scan stays in C without ever copying
+            # more than 1 MiB at a time
+            for pos in range(start, end, 1 << 20):
+                first_line += mm[pos:min(pos + (1 << 20), end)].count(b'\n')
+        mm.close()
+
+    # imap keeps the chunks ordered while letting workers run ahead
+    with multiprocessing.Pool(len(tasks)) as pool:
+        for chunk in pool.imap(_decode_chunk, tasks):
+            fout.write(chunk)
+
 # ==============================
 # Process input file
 # ==============================
 def process_file(input_file, output_file):
     """Reads input file, decodes $HEX[...] lines, and writes to output file."""
-    decoded_lines = []
-    warnings = []
-
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.rstrip('\n\r')
-
-                # Check if line matches $HEX[hexadecimal] pattern
-                match = re.match(r'^\$HEX\[([0-9A-Fa-f]+)\]$', line)
-
-                if match:
-                    hex_value = match.group(1)
-                    result = convert_hex_to_utf8(hex_value)
-
-                    if isinstance(result, tuple):
-                        decoded, msg = result
-                        if decoded is not None:
-                            decoded_lines.append(decoded)
-                            warnings.append(f"Line {line_num}: {msg}")
-                        else:
-                            decoded_lines.append(line)
-                            warnings.append(f"Line {line_num}: Failed - {msg}")
-                    else:
-                        # Successful UTF-8 decode
-                        decoded_lines.append(result)
-                else:
-                    # Non-HEX lines remain unchanged
-                    decoded_lines.append(line)
-
-        # Write all decoded lines to the output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(decoded_lines) + '\n')
-
-        if warnings:
-            print("\nWarnings:")
-            for warning in warnings:
-                print(f"  {warning}")
+        # Both files stay in binary mode: the input is overwhelmingly ASCII
+        # hex, so skipping the text-mode UTF-8 codec halves the bytes touched
+        # and only the decoded payloads ever become Python strings
+        with open(input_file, 'rb') as fin, \
+                open(output_file, 'wb', buffering=1 << 20) as fout:
+            if os.path.getsize(input_file) <= _BULK_READ_LIMIT:
+                # For files that fit comfortably in RAM, one read() plus a
+                # single split is much faster than the per-line iterator,
+                # and all hex payloads decode in a single C pass
+                _process_bulk(_split_lines(fin.read()), fout)
+            elif (os.cpu_count() or 1) > 1:
+                # Huge file on a multi-core box: decode is CPU-bound and
+                # embarrassingly parallel, so fan out across processes
+                _process_parallel(input_file, fout)
+            else:
+                # Stream through an mmap to keep memory bounded: newline
+                # scanning runs in C, the OS page cache does the readahead,
+                # and no read() syscalls or per-line buffering are needed;
+                # the 1 MiB output buffer amortizes the write syscalls
+                mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    size = mm.size()
+                    pos = 0
+                    line_num = 1  # first line of the current batch
+                    batch = []
+
+                    # Collect fixed-size batches and push each through the
+                    # classify -> batch-decode -> single-write pipeline
+                    # instead of interleaving scan, decode, and write per
+                    # line; same work, far better cache behavior
+                    while pos < size:
+                        nl = mm.find(b'\n', pos)
+                        end = size if nl == -1 else nl
+                        line = mm[pos:end]
+                        if line.endswith(b'\r'):
+                            line = line[:-1]
+                        batch.append(line)
+
+                        if len(batch) == _BATCH_LINES:
+                            # _process_bulk appends its join sentinel to the
+                            # batch, so advance by the real line count, not
+                            # by len(batch) after the call
+                            _process_bulk(batch, fout, line_num)
+                            line_num += _BATCH_LINES
+                            batch = []
+
+                        pos = end + 1
+
+                    if batch:
+                        _process_bulk(batch, fout, line_num)
+                finally:
+                    mm.close()
 
         print(f"\nDecoded output written to '{output_file}'")
 
@@ -155,6 +324,37 @@ def process_file(input_file, output_file):
 # ==============================
 def main():
     """Parses command-line arguments and runs the hex decoder."""
+    argv = sys.argv[1:]
+
+    # Fast path for the two common invocation shapes: importing and
+    # building the full ArgumentParser dominates startup when decoding a
+    # single hex string from a shell loop
+    input_arg = output_arg = None
+    if len(argv) == 2 and argv[0] in ('-i', '--input') and not argv[1].startswith('-'):
+        input_arg = argv[1]
+    elif (len(argv) == 4 and argv[0] in ('-i', '--input')
+            and not argv[1].startswith('-') and argv[2] in ('-o', '--output')
+            and not argv[3].startswith('-')):
+        input_arg, output_arg = argv[1], argv[3]
+
+    if input_arg is None:
+        input_arg, output_arg = _parse_args()
+
+    # Determine if input is a file or a hex string
+    if os.path.isfile(input_arg):
+        # Input is a file - require output file
+        if not output_arg:
+            print(f"{LIGHT_RED}Error: --output is required when processing a file.{RESET}", file=sys.stderr)
+            sys.exit(1)
+        process_file(input_arg, output_arg)
+    else:
+        # Input is treated as a hex string
+        process_hex_string(input_arg, output_arg)
+
+def _parse_args():
+    """Full argument parsing for anything the fast path does not cover."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Hashcat Hex Decoder - Converts lines with $HEX[...] encoding to UTF-8 text',
         epilog='''Examples:
@@ -178,17 +378,7 @@ def main():
         sys.exit(0)
 
     args = parser.parse_args()
-
-    # Determine if input is a file or a hex string
-    if os.path.isfile(args.input):
-        # Input is a file - require output file
-        if not args.output:
-            print(f"{LIGHT_RED}Error: --output is required when processing a file.{RESET}", file=sys.stderr)
-            sys.exit(1)
-        process_file(args.input, args.output)
-    else:
-        # Input is treated as a hex string
-        process_hex_string(args.input, args.output)
+    return args.input, args.output
 
 if __name__ == '__main__':
     main()